@@ -2,6 +2,7 @@
 
 from sorl.thumbnail.admin import AdminImageMixin
 from django.contrib import admin
+from django.forms.models import BaseInlineFormSet
 from singleton.admin import SingletonModelAdmin
 from .models import (
     Configuracion, Libro, Autor, Genero, Socio, Bibliotecario, Prestamo, LibroAutor, Ejemplar, PrestamoPendiente)
@@ -13,13 +14,26 @@ class ConfiguracionAdmin(SingletonModelAdmin):
     pass
 
 
+class LibroInlineFormSet(BaseInlineFormSet):
+    """Cada fila recibe el libro que se está editando, así su __str__ no lo vuelve a consultar"""
+    def _construct_form(self, i, **kwargs):
+        form = super(LibroInlineFormSet, self)._construct_form(i, **kwargs)
+        setattr(form.instance, self.fk.name, self.instance)
+        return form
+
+
 class LibroAutorInline(admin.StackedInline):
     model = LibroAutor
+    formset = LibroInlineFormSet
     extra = 0
 
+    def get_queryset(self, request):
+        return super(LibroAutorInline, self).get_queryset(request).select_related('autor')
+
 
 class EjemplarInline(admin.StackedInline):
     model = Ejemplar
+    formset = LibroInlineFormSet
     extra = 0
 
 
@@ -27,11 +41,28 @@ class EjemplarInline(admin.StackedInline):
 class LibroAdmin(AdminImageMixin, admin.ModelAdmin):
     from .forms import LibroForm
 
-    list_display = ["isbn", "__str__", "thumb_libro"]
+    list_display = ["isbn_display", "__str__", "thumb_libro"]
 
     form = LibroForm
     inlines = [LibroAutorInline, EjemplarInline]
 
+    def get_queryset(self, request):
+        queryset = super(LibroAdmin, self).get_queryset(request)
+        # El listado solo muestra ISBN, título y miniatura: no hace falta traer el resto.
+        # Las vistas de edición y borrado necesitan el libro completo.
+        if request.resolver_match and request.resolver_match.url_name == 'app_libro_changelist':
+            queryset = queryset.only('isbn', 'titulo', 'thumb_url')
+        return queryset
+
+    def save_formset(self, request, form, formset, change):
+        if formset.model is not LibroAutor:
+            return super(LibroAdmin, self).save_formset(request, form, formset, change)
+        # commit=False deja armado el mensaje del historial; los autores se escriben con un DELETE y un INSERT
+        formset.save(commit=False)
+        form.instance.set_autores(
+            f.cleaned_data['autor'].pk for f in formset.forms
+            if f.cleaned_data and not f.cleaned_data.get('DELETE'))
+
 
 @admin.register(Autor)
 class AutorAdmin(admin.ModelAdmin):
@@ -46,14 +77,26 @@ class GeneroAdmin(admin.ModelAdmin):
 class SocioAdmin(admin.ModelAdmin):
     from .forms import SocioForm
     form = SocioForm
+    search_fields = ('nombre_completo', 'dni')
 
 
-admin.site.register(Bibliotecario)
+@admin.register(Bibliotecario)
+class BibliotecarioAdmin(admin.ModelAdmin):
+    from .forms import BibliotecarioForm
+    form = BibliotecarioForm
+    search_fields = ('nombre_completo', 'dni')
 
 
 @admin.register(Prestamo)
 class PrestamoAdmin(admin.ModelAdmin):
     list_display = ["id", "socio", "ejemplar", "entrego", "recibio", "fecha_max_dev", "fecha_dev"]
+    list_select_related = ["ejemplar__libro", "socio", "entrego", "recibio"]
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        # Las opciones del select muestran el título del libro de cada ejemplar
+        if db_field.name == 'ejemplar':
+            kwargs['queryset'] = Ejemplar.objects.select_related('libro')
+        return super(PrestamoAdmin, self).formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 @admin.register(PrestamoPendiente)
@@ -14,6 +14,11 @@ class DevolucionForm(forms.ModelForm):
             'ejemplar': forms.Select(attrs={'class': 'form-control'}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super(DevolucionForm, self).__init__(*args, **kwargs)
+        # El __str__ de cada opción usa el libro del ejemplar
+        self.fields['ejemplar'].queryset = Ejemplar.objects.select_related('libro')
+
     def save(self, commit=True):
         recibio = self.cleaned_data.get('recibio')
         self.instance.recibio = recibio
@@ -34,17 +39,17 @@ class PrestamoForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super(PrestamoForm, self).__init__(*args, **kwargs)
         from django.db.models import Q
-        self.fields['ejemplar'].queryset = Ejemplar.objects.filter(
-            Q(prestamo__isnull=True) | Q(prestamo__fecha_dev__isnull=False)
+        self.fields['ejemplar'].queryset = Ejemplar.objects.select_related('libro').filter(
+            Q(prestamos__isnull=True) | Q(prestamos__fecha_dev__isnull=False)
         )
 
     def clean_socio(self):
         socio = self.cleaned_data.get('socio')
-        prestamos_mora = socio.prestamo_set.filter(
+        prestamos_mora = socio.prestamos.filter(
             fecha_dev__isnull=True, fecha_max_dev__lt=date.today()
         )
-        prestamos_sin_devolver = socio.prestamo_set.filter(fecha_dev__isnull=True)
-        if prestamos_sin_devolver.count() > Configuracion.load().cant_max_prest_act:
+        prestamos_sin_devolver = socio.prestamos.filter(fecha_dev__isnull=True)
+        if prestamos_sin_devolver.count() > Configuracion.cached().cant_max_prest_act:
             raise forms.ValidationError(f"El socio tiene {prestamos_sin_devolver.count()} ejemplares sin devolver.")
 
         if prestamos_mora.exists():
@@ -88,6 +93,13 @@ class SocioForm(forms.ModelForm):
         return celular
 
 
+class BibliotecarioForm(SocioForm):
+    def __init__(self, *args, **kwargs):
+        super(BibliotecarioForm, self).__init__(*args, **kwargs)
+        # Sin usuario no es bibliotecario y el alta desaparecería del listado
+        self.fields['usuario'].required = True
+
+
 class BuscadorForm(forms.Form):
     libro = forms.CharField(
         required=False,
@@ -111,7 +123,7 @@ class BuscadorForm(forms.Form):
     def buscar_libros(self):
         texto = self.cleaned_data.get("libro")
         nro_doc_socio = self.cleaned_data.get("nro_doc_socio")
-        resultado_busqueda = Libro.objects.filter(titulo__icontains=texto)
+        resultado_busqueda = Libro.objects.select_related('genero').with_remanente().filter(titulo__icontains=texto)
 
         return resultado_busqueda
 
@@ -120,12 +132,13 @@ class BuscadorForm(forms.Form):
         nro_doc_socio = self.cleaned_data.get("nro_doc_socio")
         if not texto and not nro_doc_socio:
             # return Libro.objects.none()
-            return Libro.objects.all()
+            return Libro.objects.select_related('genero').with_remanente()
 
         if not nro_doc_socio:
-            return Libro.objects.filter(titulo__icontains=texto)
+            return Libro.objects.select_related('genero').with_remanente().filter(titulo__icontains=texto)
 
-        prestamos = Prestamo.objects.filter(socio__dni__icontains=nro_doc_socio)
+        prestamos = Prestamo.objects.select_related('ejemplar__libro', 'socio').filter(
+            socio__dni__icontains=nro_doc_socio)
         if texto:
             prestamos = prestamos.filter(ejemplar__libro__titulo__icontains=texto)
 
@@ -139,14 +152,14 @@ class LibroForm(forms.ModelForm):
 
     class Meta:
         model = Libro
-        exclude = []
+        exclude = ['isbn']
 
     def __init__(self, *args, **kwargs):
         instance = kwargs.get('instance', None)
         super(LibroForm, self).__init__(*args, **kwargs)
         if instance and instance.pk:
             self.fields['ISBN'] = forms.CharField(
-                initial=instance.isbn(), required=False, label='ISBN', widget=forms.TextInput(
+                initial=instance.isbn_display(), required=False, label='ISBN', widget=forms.TextInput(
                     attrs={'class': 'form-control', 'readonly': 'readonly'}))
         elif instance is None or instance.pk is None:
             self.fields['ISBN'] = forms.CharField(
@@ -162,6 +175,9 @@ class LibroForm(forms.ModelForm):
         ISBN = "".join(re.findall(r'[0-9]+', ISBN))
         if len(ISBN) != 13 or not ISBN.isdigit():
             raise forms.ValidationError(f'El ISBN debe contener exactamente 13 dígitos. "{ISBN}" no es válido.')
+        # isbn queda fuera del form, así que Django no valida su unicidad: sin esto se pisaría el libro existente
+        if self.instance._state.adding and Libro.objects.filter(pk=ISBN).exists():
+            raise forms.ValidationError(f'Ya existe un libro con el ISBN "{ISBN}".')
         return ISBN
 
     def save(self, commit=True):
@@ -0,0 +1,18 @@
+# -*- coding: UTF-8 -*-
+
+from django.core.management.base import BaseCommand
+
+from app.models import Libro
+
+
+class Command(BaseCommand):
+    help = "Genera las miniaturas de las portadas y completa Libro.thumb_url de los libros existentes"
+
+    def handle(self, *args, **options):
+        actualizados = 0
+        for libro in Libro.objects.only('isbn', 'portada', 'thumb_url').iterator():
+            thumb_url = libro.generar_thumb_url()
+            if thumb_url != libro.thumb_url:
+                Libro.objects.filter(pk=libro.pk).update(thumb_url=thumb_url)
+                actualizados += 1
+        self.stdout.write(self.style.SUCCESS(f"{actualizados} miniaturas actualizadas."))
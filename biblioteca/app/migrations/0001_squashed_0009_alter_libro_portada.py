@@ -0,0 +1,158 @@
+# Generated by Django 5.1.1 on 2026-10-15 01:06
+# Esquema de las migraciones 0001 a 0009 que ya figuran aplicadas en db.sqlite3 pero no estaban en el repositorio.
+
+import django.db.models.deletion
+import sorl.thumbnail.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    replaces = [
+        ('app', '0001_initial'),
+        ('app', '0002_prestamopendiente_alter_prestamo_fecha_dev'),
+        ('app', '0003_alter_socio_celular'),
+        ('app', '0004_alter_socio_telefono'),
+        ('app', '0005_alter_socio_celular_alter_socio_telefono'),
+        ('app', '0006_alter_libro_titulo'),
+        ('app', '0007_libro_cant_ej_libro_remanente'),
+        ('app', '0008_libro_portada'),
+        ('app', '0009_alter_libro_portada'),
+    ]
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Autor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(blank=True, max_length=30, null=True)),
+                ('apellido', models.CharField(blank=True, max_length=30, null=True)),
+                ('pseudonimo', models.CharField(blank=True, max_length=30, null=True, verbose_name='Pseudónimo')),
+                ('modificado', models.DateTimeField(auto_now=True)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Autores',
+            },
+        ),
+        migrations.CreateModel(
+            name='Socio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dni', models.CharField(max_length=10, unique=True, verbose_name='DNI')),
+                ('nombre', models.CharField(max_length=50)),
+                ('apellido', models.CharField(max_length=50)),
+                ('email', models.EmailField(max_length=50)),
+                ('direccion', models.CharField(max_length=50)),
+                ('celular', models.CharField(blank=True, max_length=20, null=True)),
+                ('telefono', models.CharField(blank=True, max_length=20, null=True)),
+                ('fecha_nacimiento', models.DateField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Configuracion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('plazo_max_devolucion', models.IntegerField(default=3, help_text='Expresado en días', verbose_name='Plazo máximo de devolución')),
+                ('cant_max_prest_act', models.IntegerField(default=3, verbose_name='Cant. máxima de préstamos activos')),
+            ],
+            options={
+                'verbose_name': 'Configuración',
+                'verbose_name_plural': 'Configuraciones',
+            },
+        ),
+        migrations.CreateModel(
+            name='Genero',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('descripcion', models.CharField(max_length=30, unique=True, verbose_name='Descripción')),
+            ],
+            options={
+                'verbose_name': 'Género',
+                'verbose_name_plural': 'Géneros',
+            },
+        ),
+        migrations.CreateModel(
+            name='Bibliotecario',
+            fields=[
+                ('socio_ptr', models.OneToOneField(auto_created=True, on_delete=django.db.models.deletion.CASCADE, parent_link=True, primary_key=True, serialize=False, to='app.socio')),
+                ('desde', models.DateTimeField(auto_now_add=True)),
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, to=settings.AUTH_USER_MODEL)),
+            ],
+            bases=('app.socio',),
+        ),
+        migrations.CreateModel(
+            name='Libro',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('titulo', models.CharField(max_length=70, verbose_name='Título')),
+                ('cant_pag', models.IntegerField(default=0, verbose_name='Cant. de páginas')),
+                ('cant_ej', models.IntegerField(default=0, verbose_name='Cant. de ejemplares')),
+                ('remanente', models.IntegerField(default=0, verbose_name='Ejemplares a disposición')),
+                ('portada', sorl.thumbnail.fields.ImageField(blank=True, max_length=255, null=True, upload_to='libros/%Y')),
+                ('genero', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='app.genero', verbose_name='Género')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Ejemplar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nro_ejemplar', models.IntegerField()),
+                ('libro', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.libro')),
+            ],
+            options={
+                'verbose_name_plural': 'Ejemplares',
+                'unique_together': {('libro', 'nro_ejemplar')},
+            },
+        ),
+        migrations.CreateModel(
+            name='LibroAutor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('autor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.autor')),
+                ('libro', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.libro')),
+            ],
+            options={
+                'verbose_name_plural': 'Libros autores',
+            },
+        ),
+        migrations.AddField(
+            model_name='libro',
+            name='autores',
+            field=models.ManyToManyField(through='app.LibroAutor', to='app.autor', verbose_name='Autores'),
+        ),
+        migrations.CreateModel(
+            name='Prestamo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_max_dev', models.DateField(editable=False, help_text='El socio debe devolver el libro antes de esta fecha.', verbose_name='Fecha máxima de devolución')),
+                ('fecha_dev', models.DateField(blank=True, editable=False, null=True, verbose_name='Fecha de devolución')),
+                ('ejemplar', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='app.ejemplar')),
+                ('socio', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='app.socio')),
+                ('entrego', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='entrego', to='app.bibliotecario')),
+                ('recibio', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='recibio', to='app.bibliotecario')),
+            ],
+            options={
+                'verbose_name': 'Préstamo',
+                'verbose_name_plural': 'Préstamos',
+            },
+        ),
+        migrations.CreateModel(
+            name='PrestamoPendiente',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('app.prestamo',),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.1 on 2026-10-15 01:10
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def completar_isbn(apps, schema_editor):
+    """
+    Los libros cargados antes del cambio tienen como clave su viejo id numérico. Los que no llegan a 13 dígitos
+    se completan con ceros a la izquierda para cumplir el CHECK; los ceros iniciales los delatan para corregirlos.
+    """
+    Libro = apps.get_model('app', 'Libro')
+    Ejemplar = apps.get_model('app', 'Ejemplar')
+    LibroAutor = apps.get_model('app', 'LibroAutor')
+    for isbn in list(Libro.objects.values_list('isbn', flat=True)):
+        nuevo = str(isbn).zfill(13)
+        if nuevo != str(isbn):
+            Libro.objects.filter(isbn=isbn).update(isbn=nuevo)
+            Ejemplar.objects.filter(libro_id=isbn).update(libro_id=nuevo)
+            LibroAutor.objects.filter(libro_id=isbn).update(libro_id=nuevo)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_squashed_0009_alter_libro_portada'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='libro',
+            old_name='id',
+            new_name='isbn',
+        ),
+        migrations.AlterField(
+            model_name='libro',
+            name='isbn',
+            field=models.CharField(max_length=13, primary_key=True, serialize=False, validators=[django.core.validators.RegexValidator('^\\d{13}$', 'El ISBN debe contener exactamente 13 dígitos.')]),
+        ),
+        migrations.RunPython(completar_isbn, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='libro',
+            constraint=models.CheckConstraint(condition=models.Q(('isbn__regex', '^\\d{13}$')), name='isbn_13_digits'),
+        ),
+    ]
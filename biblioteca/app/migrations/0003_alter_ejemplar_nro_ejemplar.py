@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-15 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_libro_isbn'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ejemplar',
+            name='nro_ejemplar',
+            field=models.IntegerField(editable=False),
+        ),
+    ]
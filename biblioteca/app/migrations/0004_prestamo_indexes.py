@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-15 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_alter_ejemplar_nro_ejemplar'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='prestamo',
+            index=models.Index(fields=['fecha_dev'], name='app_prestam_fecha_d_1d9245_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prestamo',
+            index=models.Index(fields=['socio', 'fecha_dev'], name='app_prestam_socio_i_40d557_idx'),
+        ),
+    ]
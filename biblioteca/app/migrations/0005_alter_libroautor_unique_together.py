@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-15 01:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_prestamo_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='libroautor',
+            unique_together={('libro', 'autor')},
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-15 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_alter_libroautor_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='prestamo',
+            constraint=models.UniqueConstraint(condition=models.Q(('fecha_dev__isnull', True)), fields=('ejemplar',), name='unique_active_loan_per_ejemplar'),
+        ),
+    ]
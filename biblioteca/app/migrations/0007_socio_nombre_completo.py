@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-15 01:20
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_prestamo_unique_active_loan_per_ejemplar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='socio',
+            name='nombre_completo',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Concat('apellido', models.Value(', '), 'nombre'), output_field=models.CharField(max_length=102)),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-15 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_socio_nombre_completo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='libro',
+            name='thumb_url',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-15 01:20
+
+import app.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_libro_thumb_url'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='prestamo',
+            name='fecha_max_dev',
+            field=models.DateField(default=app.models.fecha_max_devolucion, editable=False, help_text='El socio debe devolver el libro antes de esta fecha.', verbose_name='Fecha máxima de devolución'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-15 01:20
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_alter_prestamo_fecha_max_dev'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='autor',
+            name='creado',
+            field=models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False),
+        ),
+        migrations.AlterField(
+            model_name='bibliotecario',
+            name='desde',
+            field=models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-15 01:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_alter_autor_creado'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ejemplar',
+            name='libro',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ejemplares', to='app.libro'),
+        ),
+        migrations.AlterField(
+            model_name='prestamo',
+            name='ejemplar',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='prestamos', to='app.ejemplar'),
+        ),
+        migrations.AlterField(
+            model_name='prestamo',
+            name='socio',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='prestamos', to='app.socio'),
+        ),
+    ]
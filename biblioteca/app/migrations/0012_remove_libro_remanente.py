@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-15 01:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_related_names'),
+    ]
+
+    operations = [
+        # Los ejemplares a disposición se calculan con LibroQuerySet.with_remanente()
+        migrations.RemoveField(
+            model_name='libro',
+            name='remanente',
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.1.1 on 2026-10-15 01:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def copiar_bibliotecarios(apps, schema_editor):
+    """Paso el usuario y la fecha de cada bibliotecario a su fila de socio antes de borrar app_bibliotecario"""
+    Socio = apps.get_model('app', 'Socio')
+    Bibliotecario = apps.get_model('app', 'Bibliotecario')
+    for bibliotecario in Bibliotecario.objects.all():
+        Socio.objects.filter(pk=bibliotecario.socio_ptr_id).update(
+            bib_usuario=bibliotecario.usuario_id, bib_desde=bibliotecario.desde)
+
+
+def restaurar_bibliotecarios(apps, schema_editor):
+    Socio = apps.get_model('app', 'Socio')
+    Bibliotecario = apps.get_model('app', 'Bibliotecario')
+    for socio in Socio.objects.filter(bib_usuario__isnull=False):
+        # raw=True inserta solo la fila hija: la de socio ya existe
+        Bibliotecario(
+            socio_ptr_id=socio.pk, usuario_id=socio.bib_usuario_id, desde=socio.bib_desde
+        ).save_base(raw=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_remove_libro_remanente'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Nombres temporales: Bibliotecario todavía hereda de Socio y sus campos chocarían con los nuevos
+        migrations.AddField(
+            model_name='socio',
+            name='bib_usuario',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='socio',
+            name='bib_desde',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(copiar_bibliotecarios, restaurar_bibliotecarios),
+        # bibliotecario.socio_ptr_id == socio.id, así que los valores de las FK no cambian
+        migrations.AlterField(
+            model_name='prestamo',
+            name='entrego',
+            field=models.ForeignKey(limit_choices_to={'es_bibliotecario': True}, on_delete=django.db.models.deletion.PROTECT, related_name='entrego', to='app.socio'),
+        ),
+        migrations.AlterField(
+            model_name='prestamo',
+            name='recibio',
+            field=models.ForeignKey(blank=True, limit_choices_to={'es_bibliotecario': True}, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='recibio', to='app.socio'),
+        ),
+        migrations.DeleteModel(
+            name='Bibliotecario',
+        ),
+        migrations.RenameField(
+            model_name='socio',
+            old_name='bib_usuario',
+            new_name='usuario',
+        ),
+        migrations.RenameField(
+            model_name='socio',
+            old_name='bib_desde',
+            new_name='desde',
+        ),
+        migrations.AlterField(
+            model_name='socio',
+            name='usuario',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='bibliotecario', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='socio',
+            name='es_bibliotecario',
+            field=models.GeneratedField(db_persist=True, expression=models.Q(('usuario__isnull', False)), output_field=models.BooleanField()),
+        ),
+        migrations.CreateModel(
+            name='Bibliotecario',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('app.socio',),
+        ),
+    ]
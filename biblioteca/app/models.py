@@ -1,11 +1,88 @@
 # -*- coding: UTF-8 -*-
 
 
-from django.core.exceptions import ValidationError
+import logging
+from datetime import date, timedelta
+from time import monotonic
+
 from django.contrib.auth.models import User
-from django.db import models
+from django.core.validators import RegexValidator
+from django.db import models, transaction
+from django.db.models import DEFERRED, Count, F, Max, Q, Value
+from django.db.models.functions import Concat, Now
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from sorl.thumbnail import ImageField as SorlImageField, get_thumbnail
+
+
+logger = logging.getLogger(__name__)
+
+ISBN13_REGEX = r'^\d{13}$'
+THUMB_TMPL = '<a href="{url}" target="_blank"><img src="{src}" /></a>'
+
+
+class DirtyFieldsMixin:
+    """
+    Recuerda los valores leídos de la base para que save() escriba solo las columnas modificadas.
+    Si no cambió nada, Django no ejecuta el UPDATE ni dispara las señales.
+    Como todo save() con update_fields, si la fila se borró después de leerla no se vuelve a insertar:
+    Django lanza DatabaseError("Save with update_fields did not affect any rows.").
+    """
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._valores_db = dict(zip(field_names, values))
+        return instance
+
+    def get_dirty_fields(self):
+        valores_db = getattr(self, '_valores_db', None)
+        if valores_db is None:
+            return None
+        dirty = []
+        for field in self._meta.concrete_fields:
+            # Los campos diferidos que nadie asignó no están en __dict__
+            if field.generated or field.attname not in self.__dict__:
+                continue
+            valor_db = valores_db.get(field.attname, DEFERRED)
+            if valor_db is DEFERRED or valor_db != self.__dict__[field.attname]:
+                dirty.append(field.name)
+        return dirty
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        # Lo releído pasa a ser el valor de la base: si no, volver al valor viejo no se guardaría
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._valores_db = getattr(self, '_valores_db', None) or {}
+        for field in self._meta.concrete_fields:
+            if field.attname in self.__dict__ and (fields is None or field.name in fields or field.attname in fields):
+                self._valores_db[field.attname] = self.__dict__[field.attname]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            dirty = self.get_dirty_fields()
+            # Si cambió la clave primaria se guarda completo, como hace Django
+            if dirty is not None and self._meta.pk.name not in dirty:
+                kwargs['update_fields'] = dirty
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        self._valores_db = getattr(self, '_valores_db', {}) if update_fields is not None else {}
+        for field in self._meta.concrete_fields:
+            if field.attname in self.__dict__ and (update_fields is None or field.name in update_fields):
+                self._valores_db[field.attname] = self.__dict__[field.attname]
+
+
+# Managers y querysets propios
+class LibroQuerySet(models.QuerySet):
+    def with_remanente(self):
+        """Libros con los ejemplares a disposición calculados por la base: cant_ej menos los préstamos pendientes"""
+        return self.annotate(remanente=F('cant_ej') - Count(
+            'ejemplares__prestamos', filter=Q(ejemplares__prestamos__fecha_dev__isnull=True)))
 
 
+class BibliotecarioManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(es_bibliotecario=True)
+
 
 # app.models.py
 class Autor(models.Model):
@@ -17,7 +94,7 @@ class Autor(models.Model):
     apellido = models.CharField(max_length=30, null=True, blank=True)
     pseudonimo = models.CharField(max_length=30, verbose_name='Pseudónimo', null=True, blank=True)
     modificado = models.DateTimeField(auto_now=True)
-    creado = models.DateTimeField(auto_now_add=True)
+    creado = models.DateTimeField(db_default=Now(), editable=False)
 
     class Meta:
         verbose_name_plural = 'Autores'
@@ -38,57 +115,78 @@ class Genero(models.Model):
         return self.descripcion
 
 
-class Libro(models.Model):
+class Libro(DirtyFieldsMixin, models.Model):
     """
     Los libros se identifican mediante su ISBN, tienen un título, cantidad de páginas, uno o más autores y
     pertenecen a un género literario.
     """
-    from sorl.thumbnail import ImageField as SorlImageField
-
-    def validate_isbn13(value):
-        """Valida que el ISBN tenga exactamente 13 dígitos """
-        if len(value) != 13 or not value.isdigit():
-            raise ValidationError(f'El ISBN debe contener exactamente 13 dígitos. "{value}" no es válido.')
-
-    isbn = models.CharField(max_length=13, primary_key=True, validators=[validate_isbn13])
+    isbn = models.CharField(max_length=13, primary_key=True, validators=[
+        RegexValidator(ISBN13_REGEX, 'El ISBN debe contener exactamente 13 dígitos.')])
     titulo = models.CharField(max_length=70, verbose_name="Título")
     cant_pag = models.IntegerField(default=0, verbose_name="Cant. de páginas")
     cant_ej = models.IntegerField(default=0, verbose_name="Cant. de ejemplares", editable=True)
-    remanente = models.IntegerField(default=0, verbose_name="Ejemplares a disposición", editable=True)
     genero = models.ForeignKey(Genero, on_delete=models.PROTECT, verbose_name="Género")
     autores = models.ManyToManyField(Autor, verbose_name="Autores", through='LibroAutor')
     portada = SorlImageField(max_length=255, null=True, blank=True, upload_to='libros/%Y')
+    thumb_url = models.CharField(max_length=255, blank=True, default='', editable=False)
+
+    objects = LibroQuerySet.as_manager()
+
+    class Meta:
+        constraints = [models.CheckConstraint(condition=Q(isbn__regex=ISBN13_REGEX), name='isbn_13_digits')]
 
     def __str__(self):
         return self.titulo
 
-    def isbn(self):
+    def save(self, *args, **kwargs):
+        # La miniatura se genera una sola vez al guardar, así los listados no consultan el KVStore de sorl-thumbnail
+        update_fields = kwargs.get('update_fields')
+        modificados = update_fields if update_fields is not None else self.get_dirty_fields()
+        if self._state.adding or modificados is None or 'portada' in modificados:
+            self.thumb_url = self.generar_thumb_url()
+            if update_fields is not None:
+                kwargs['update_fields'] = [*update_fields, 'thumb_url']
+        super().save(*args, **kwargs)
+
+    def generar_thumb_url(self):
+        if not self.portada:
+            return ""
+        # Si la portada es un archivo nuevo todavía no está en el storage: pre_save lo sube
+        portada = self._meta.get_field('portada').pre_save(self, self._state.adding)
         try:
-            isbn = str(self.id)
-            return "-".join([isbn[0:3], isbn[3:4], isbn[4:6], isbn[6:12], isbn[12]])
-        except:
-            return "completar ISBN"
+            return get_thumbnail(portada, "100", crop="center", quality=95).url
+        except Exception:
+            logger.exception("No se pudo generar la miniatura de la portada del libro %s", self.pk)
+            return ""
+
+    def isbn_display(self):
+        s = self.isbn or ''
+        return f'{s[0:3]}-{s[3:4]}-{s[4:6]}-{s[6:12]}-{s[12:13]}' if len(s) == 13 else "completar ISBN"
+    isbn_display.short_description = "ISBN"
+
+    def set_autores(self, autor_ids):
+        """
+        Deja al libro con exactamente los autores indicados: un DELETE para los que sobran y
+        un único INSERT para los nuevos.
+        """
+        autor_ids = list(autor_ids)
+        self.libroautor_set.exclude(autor_id__in=autor_ids).delete()
+        LibroAutor.objects.bulk_create(
+            [LibroAutor(libro=self, autor_id=autor_id) for autor_id in autor_ids], ignore_conflicts=True)
 
     def thumb_libro(self):
-        from django.utils.safestring import mark_safe
-        from sorl.thumbnail import get_thumbnail
-        try:
-            from django.urls import reverse
-            return mark_safe(
-                f'<a href=\"{reverse("admin:app_libro_change", args=[self.pk])}\" target="_blank">'
-                f'<img src="{get_thumbnail(self.portada, "100", crop="center", quality=95).url}" /></a>')
-        except:
-            pass
-        return ""
+        if not self.thumb_url:
+            return ""
+        return mark_safe(THUMB_TMPL.format(url=reverse("admin:app_libro_change", args=[self.pk]), src=self.thumb_url))
     thumb_libro.short_description = "Portada"
 
 
-
 class LibroAutor(models.Model):
     libro = models.ForeignKey(Libro, on_delete=models.CASCADE)
     autor = models.ForeignKey(Autor, on_delete=models.CASCADE)
 
     class Meta:
+        unique_together = ('libro', 'autor')
         verbose_name_plural = 'Libros autores'
 
     def __str__(self):
@@ -96,8 +194,8 @@ class LibroAutor(models.Model):
 
 
 class Ejemplar(models.Model):
-    libro = models.ForeignKey(Libro, on_delete=models.CASCADE)
-    nro_ejemplar = models.IntegerField()
+    libro = models.ForeignKey(Libro, on_delete=models.CASCADE, related_name='ejemplares')
+    nro_ejemplar = models.IntegerField(editable=False)
 
     class Meta:
         unique_together = ('libro', 'nro_ejemplar')
@@ -107,12 +205,28 @@ class Ejemplar(models.Model):
         return "{}-{}".format(self.nro_ejemplar, self.libro)
 
     def save(self, *args, **kwargs):
-        from django.db.models import Max
-        if not self.pk:
-            self.nro_ejemplar = self.libro.ejemplar_set.aggregate(
-                Max("nro_ejemplar", default=0))['nro_ejemplar__max'] + 1
+        if not self.pk and not self.nro_ejemplar:
+            self.nro_ejemplar = self.ultimo_nro(self.libro_id) + 1
         super().save(*args, **kwargs)
 
+    @classmethod
+    def ultimo_nro(cls, libro_id):
+        return cls.objects.filter(libro_id=libro_id).aggregate(
+            Max("nro_ejemplar", default=0))['nro_ejemplar__max']
+
+    @classmethod
+    def bulk_add(cls, libro, n):
+        """
+        Crea n ejemplares del libro en tres consultas: el último número de ejemplar, el INSERT masivo
+        y un único UPDATE de la cantidad de ejemplares del libro, que reemplaza al post_save que bulk_create no dispara.
+        """
+        with transaction.atomic():
+            inicio = cls.ultimo_nro(libro.pk)
+            ejemplares = cls.objects.bulk_create(
+                [cls(libro=libro, nro_ejemplar=inicio + i + 1) for i in range(n)], batch_size=1000)
+            Libro.objects.filter(pk=libro.pk).update(cant_ej=F('cant_ej') + n)
+        return ejemplares
+
 
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
@@ -121,7 +235,10 @@ from django.dispatch import receiver
 @receiver(post_save, sender=Ejemplar)
 def cant_ejemp_disp(sender, instance, **kwargs):
     """
-    Actualizo la cantidad de ejemplares disponibles
+    Actualizo la cantidad de ejemplares del libro.
+    La suma se resuelve en la base con F() en un único UPDATE, sin leer el libro.
+    Para cargas masivas conviene desconectar esta señal y recalcular al final con un único
+    UPDATE app_libro SET cant_ej = (SELECT COUNT(*) FROM app_ejemplar WHERE libro_id = app_libro.isbn)
     :param sender:
     :param instance:
     :param kwargs:
@@ -130,16 +247,9 @@ def cant_ejemp_disp(sender, instance, **kwargs):
     creado = kwargs.get('created', False)
     signal = kwargs.get('signal', False)
     if creado:
-        libro = instance.libro
-        libro.cant_ej += 1
-        libro.remanente += 1
-        super(Libro, libro).save(update_fields=['cant_ej', 'remanente'])
+        Libro.objects.filter(pk=instance.libro_id).update(cant_ej=F('cant_ej') + 1)
     elif signal == post_delete:
-        libro = instance.libro
-        libro.cant_ej -= 1
-        libro.remanente -= 1
-        super(Libro, libro).save(update_fields=['cant_ej', 'remanente'])
-    pass
+        Libro.objects.filter(pk=instance.libro_id).update(cant_ej=F('cant_ej') - 1)
 
 
 class Socio(models.Model):
@@ -151,67 +261,76 @@ class Socio(models.Model):
     celular = models.CharField(max_length=20, null=True, blank=True)
     telefono = models.CharField(max_length=20, null=True, blank=True)
     fecha_nacimiento = models.DateField()
+    nombre_completo = models.GeneratedField(
+        expression=Concat('apellido', Value(', '), 'nombre'), output_field=models.CharField(max_length=102),
+        db_persist=True)
+    # Los bibliotecarios son socios con usuario del sistema, en la misma tabla
+    usuario = models.OneToOneField(
+        User, on_delete=models.PROTECT, null=True, blank=True, related_name='bibliotecario')
+    desde = models.DateTimeField(null=True, blank=True, editable=False)
+    es_bibliotecario = models.GeneratedField(
+        expression=Q(usuario__isnull=False), output_field=models.BooleanField(), db_persist=True)
 
     def __str__(self):
-        return "{}, {}".format(self.apellido, self.nombre)
+        # nombre_completo puede haber quedado viejo en memoria tras editar el socio: solo se usa para buscar y
+        # ordenar, o cuando apellido y nombre no se cargaron (p. ej. .only('nombre_completo'))
+        if 'apellido' in self.__dict__ and 'nombre' in self.__dict__:
+            return "{}, {}".format(self.apellido, self.nombre)
+        return self.nombre_completo
+
+    def save(self, *args, **kwargs):
+        # desde se fija al pasar a ser bibliotecario; con la hora de Python no hace falta releerla de la base
+        if self.usuario_id and not self.desde:
+            self.desde = timezone.now()
+        super().save(*args, **kwargs)
 
 
 class Bibliotecario(Socio):
-    desde = models.DateTimeField(auto_now_add=True)
-    usuario = models.OneToOneField(User, on_delete=models.PROTECT)
+    objects = BibliotecarioManager()
+
+    class Meta:
+        proxy = True
+
+
+def fecha_max_devolucion():
+    """Default de Prestamo.fecha_max_dev: hoy más el plazo configurado"""
+    return date.today() + timedelta(days=Configuracion.cached().plazo_max_devolucion)
 
 
-class Prestamo(models.Model):
-    ejemplar = models.ForeignKey(Ejemplar, on_delete=models.PROTECT)
-    socio = models.ForeignKey(Socio, on_delete=models.PROTECT)
-    entrego = models.ForeignKey(Bibliotecario, on_delete=models.PROTECT, related_name='entrego')
-    recibio = models.ForeignKey(Bibliotecario, on_delete=models.PROTECT, related_name='recibio', null=True, blank=True)
+class Prestamo(DirtyFieldsMixin, models.Model):
+    ejemplar = models.ForeignKey(Ejemplar, on_delete=models.PROTECT, related_name='prestamos')
+    socio = models.ForeignKey(Socio, on_delete=models.PROTECT, related_name='prestamos')
+    entrego = models.ForeignKey(
+        Socio, on_delete=models.PROTECT, related_name='entrego', limit_choices_to={'es_bibliotecario': True})
+    recibio = models.ForeignKey(
+        Socio, on_delete=models.PROTECT, related_name='recibio', null=True, blank=True,
+        limit_choices_to={'es_bibliotecario': True})
     fecha_max_dev = models.DateField(
         verbose_name="Fecha máxima de devolución", help_text="El socio debe devolver el libro antes de esta fecha.",
-        editable=False
+        default=fecha_max_devolucion, editable=False
     )
     fecha_dev = models.DateField(verbose_name="Fecha de devolución", null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name, verbose_name_plural = "Préstamo", "Préstamos"
+        # fecha_dev nula = préstamo pendiente; (socio, fecha_dev) para los préstamos activos de cada socio
+        indexes = [models.Index(fields=['fecha_dev']), models.Index(fields=['socio', 'fecha_dev'])]
+        # Un ejemplar no puede estar en dos préstamos pendientes a la vez
+        constraints = [models.UniqueConstraint(
+            fields=['ejemplar'], condition=Q(fecha_dev__isnull=True), name='unique_active_loan_per_ejemplar')]
 
     def __str__(self):
         return "{}".format(self.id)
 
     def save(self, *args, **kwargs):
-        from datetime import date, timedelta
-        hoy = date.today()
-        if not self.fecha_max_dev:
-            configuracion = Configuracion().load()
-            fecha_maxima_devolucion = hoy + timedelta(days=configuracion.plazo_max_devolucion)
-            self.fecha_max_dev = fecha_maxima_devolucion
-        if self.recibio and not self.fecha_dev:
-            self.fecha_dev = hoy
+        if self.recibio_id and not self.fecha_dev:
+            self.fecha_dev = date.today()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = [*update_fields, 'fecha_dev']
         super(Prestamo, self).save(*args, **kwargs)
 
 
-@receiver(post_save, sender=Prestamo)
-def act_prestamo(sender, instance, **kwargs):
-    """
-    Actualizo la cantidad de ejemplares disponibles
-    :param sender:
-    :param instance:
-    :param kwargs:
-    :return:
-    """
-    creado = kwargs.get('created', False)
-    signal = kwargs.get('signal', False)
-    if creado:
-        libro = instance.ejemplar.libro
-        libro.remanente -= 1
-        super(Libro, libro).save(update_fields=['remanente'])
-    elif instance.fecha_dev:
-        libro = instance.ejemplar.libro
-        libro.remanente += 1
-        super(Libro, libro).save(update_fields=['remanente'])
-    # pass
-
-
 class PrestamoPendiente(Prestamo):
     class Meta:
         proxy = True
@@ -233,3 +352,22 @@ class Configuracion(SingletonModel):
 
     def __str__(self):
         return "Configuración sistema Biblioteca"
+
+    # El post_save solo limpia la copia del proceso que guarda: los demás la releen a lo sumo cada MEMO_TTL segundos.
+    # Al vencer se lee la base y no load(), porque la caché de Django es por proceso y tendría la copia vieja
+    MEMO_TTL = 60
+    _memo = (None, 0)
+
+    @classmethod
+    def cached(cls):
+        """Configuración memorizada en el proceso, releída de la base cuando vence MEMO_TTL"""
+        configuracion, vence = cls._memo
+        if configuracion is None or monotonic() >= vence:
+            configuracion, _ = cls.objects.get_or_create(pk=1)
+            cls._memo = (configuracion, monotonic() + cls.MEMO_TTL)
+        return configuracion
+
+
+@receiver(post_save, sender=Configuracion)
+def limpiar_configuracion(sender, instance, **kwargs):
+    Configuracion._memo = (None, 0)
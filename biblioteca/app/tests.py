@@ -1,3 +1,205 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connection
 from django.test import TestCase
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+
+from .forms import BuscadorForm
+from .models import Autor, Bibliotecario, Configuracion, Ejemplar, Genero, Libro, LibroAutor, Prestamo, Socio
+
+
+class DirtyFieldsMixinTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        genero = Genero.objects.create(descripcion='G')
+        cls.libro = Libro.objects.create(pk='9780000000001', titulo='Libro', genero=genero)
+        datos = {'email': 'socio@example.com', 'direccion': 'Calle 1', 'fecha_nacimiento': date(1990, 1, 1)}
+        cls.socio = Socio.objects.create(dni='1', nombre='Ana', apellido='Perez', **datos)
+        cls.bibliotecario = Bibliotecario.objects.create(
+            dni='2', nombre='Juan', apellido='Gomez', usuario=User.objects.create(username='biblio'), **datos)
+        cls.prestamo = Prestamo.objects.create(
+            ejemplar=Ejemplar.objects.create(libro=cls.libro), socio=cls.socio, entrego=cls.bibliotecario)
+
+    def test_save_sin_cambios_no_consulta(self):
+        prestamo = Prestamo.objects.get(pk=self.prestamo.pk)
+        libro = Libro.objects.get(pk=self.libro.pk)
+        with self.assertNumQueries(0):
+            prestamo.save()
+            libro.save()
+
+    def test_devolucion_escribe_solo_recibio_y_fecha_dev(self):
+        prestamo = Prestamo.objects.get(pk=self.prestamo.pk)
+        prestamo.recibio_id = self.bibliotecario.pk
+        with CaptureQueriesContext(connection) as consultas:
+            prestamo.save()
+        self.assertEqual(len(consultas.captured_queries), 1)
+        sql = consultas.captured_queries[0]['sql']
+        self.assertIn('"recibio_id"', sql)
+        self.assertIn('"fecha_dev"', sql)
+        self.assertNotIn('"fecha_max_dev"', sql)
+        self.assertNotIn('"socio_id"', sql)
+        prestamo.refresh_from_db()
+        self.assertEqual(prestamo.fecha_dev, date.today())
+
+    def test_devolucion_con_update_fields_guarda_fecha_dev(self):
+        prestamo = Prestamo.objects.get(pk=self.prestamo.pk)
+        prestamo.recibio_id = self.bibliotecario.pk
+        prestamo.save(update_fields=['recibio'])
+        self.assertEqual(Prestamo.objects.get(pk=prestamo.pk).fecha_dev, date.today())
+
+    def test_refresh_from_db_actualiza_valores_leidos(self):
+        libro = Libro.objects.get(pk=self.libro.pk)
+        Libro.objects.filter(pk=libro.pk).update(titulo='Otro')
+        libro.refresh_from_db()
+        libro.titulo = 'Libro'
+        libro.save()
+        self.assertEqual(Libro.objects.get(pk=libro.pk).titulo, 'Libro')
+
+    def test_campos_diferidos(self):
+        libro = Libro.objects.only('titulo').get(pk=self.libro.pk)
+        libro.cant_pag = 120
+        with CaptureQueriesContext(connection) as consultas:
+            libro.save()
+        self.assertEqual(len(consultas.captured_queries), 1)
+        self.assertNotIn('"titulo"', consultas.captured_queries[0]['sql'])
+        libro = Libro.objects.get(pk=self.libro.pk)
+        self.assertEqual((libro.titulo, libro.cant_pag), ('Libro', 120))
+
+    def test_cambio_de_clave_primaria_guarda_completo(self):
+        libro = Libro.objects.get(pk=self.libro.pk)
+        libro.pk = '9780000000002'
+        libro.save()
+        self.assertEqual(Libro.objects.get(pk='9780000000002').titulo, 'Libro')
+        self.assertTrue(Libro.objects.filter(pk=self.libro.pk).exists())
+
+    def test_fila_borrada_no_se_reinserta(self):
+        libro = Libro.objects.get(pk=self.libro.pk)
+        Prestamo.objects.all().delete()
+        Libro.objects.filter(pk=libro.pk).delete()
+        libro.titulo = 'Otro'
+        with self.assertRaises(DatabaseError):
+            libro.save()
+
+
+class ListadoLibrosTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        genero = Genero.objects.create(descripcion='G')
+        cls.libros = [
+            Libro.objects.create(pk=f'978000000000{i}', titulo=f'Libro {i}', genero=genero) for i in range(3)]
+        for libro in cls.libros:
+            Ejemplar.bulk_add(libro, 2)
+        datos = {'email': 'socio@example.com', 'direccion': 'Calle 1', 'fecha_nacimiento': date(1990, 1, 1)}
+        socio = Socio.objects.create(dni='1', nombre='Ana', apellido='Perez', **datos)
+        bibliotecario = Bibliotecario.objects.create(
+            dni='2', nombre='Juan', apellido='Gomez', usuario=User.objects.create(username='biblio'), **datos)
+        Prestamo.objects.create(ejemplar=cls.libros[0].ejemplares.first(), socio=socio, entrego=bibliotecario)
+
+    def buscar(self, **datos):
+        form = BuscadorForm(datos)
+        form.is_valid()
+        return form.buscar()
+
+    def test_listado_en_una_consulta(self):
+        with self.assertNumQueries(1):
+            filas = [(libro.titulo, libro.genero.descripcion, libro.remanente) for libro in self.buscar()]
+        self.assertEqual(len(filas), 3)
+
+    def test_remanente_descuenta_prestamos_pendientes(self):
+        remanentes = {libro.pk: libro.remanente for libro in self.buscar()}
+        self.assertEqual(remanentes, {self.libros[0].pk: 1, self.libros[1].pk: 2, self.libros[2].pk: 2})
+        with self.assertNumQueries(1):
+            self.assertEqual([libro.remanente for libro in self.buscar(libro='Libro 1')], [2])
+
+
+class AutoresLibroTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.genero = Genero.objects.create(descripcion='G')
+        cls.libro = Libro.objects.create(pk='9780000000001', titulo='Libro', genero=cls.genero)
+        cls.autores = [Autor.objects.create(nombre='Autor', apellido=str(i)) for i in range(3)]
+
+    def autores_del_libro(self):
+        return set(LibroAutor.objects.filter(libro=self.libro).values_list('autor_id', flat=True))
+
+    def test_set_autores_agrega_y_quita(self):
+        a, b, c = (autor.pk for autor in self.autores)
+        with self.assertNumQueries(2):
+            self.libro.set_autores([a, b])
+        self.assertEqual(self.autores_del_libro(), {a, b})
+        self.libro.set_autores(autor_id for autor_id in [b, c])
+        self.assertEqual(self.autores_del_libro(), {b, c})
+        self.libro.set_autores([])
+        self.assertEqual(self.autores_del_libro(), set())
+
+    def test_set_autores_ignora_repetidos(self):
+        a, b, _ = (autor.pk for autor in self.autores)
+        self.libro.set_autores([a])
+        self.libro.set_autores([a, a, b])
+        self.assertEqual(LibroAutor.objects.filter(libro=self.libro).count(), 2)
+
+    def test_admin_guarda_autores_con_set_autores(self):
+        a, b, c = (autor.pk for autor in self.autores)
+        LibroAutor.objects.create(libro=self.libro, autor_id=a)
+        libro_autor = LibroAutor.objects.create(libro=self.libro, autor_id=b)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'clave'))
+        datos = {
+            'ISBN': self.libro.isbn_display(), 'titulo': 'Libro', 'cant_pag': 0, 'cant_ej': 0, 'genero': self.genero.pk,
+            'libroautor_set-TOTAL_FORMS': 3, 'libroautor_set-INITIAL_FORMS': 2,
+            'libroautor_set-0-id': LibroAutor.objects.get(autor_id=a).pk, 'libroautor_set-0-libro': self.libro.pk,
+            'libroautor_set-0-autor': a, 'libroautor_set-0-DELETE': 'on',
+            'libroautor_set-1-id': libro_autor.pk, 'libroautor_set-1-libro': self.libro.pk,
+            'libroautor_set-1-autor': b,
+            'libroautor_set-2-libro': self.libro.pk, 'libroautor_set-2-autor': c,
+            'ejemplares-TOTAL_FORMS': 0, 'ejemplares-INITIAL_FORMS': 0,
+        }
+        respuesta = self.client.post(reverse('admin:app_libro_change', args=[self.libro.pk]), datos)
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertEqual(self.autores_del_libro(), {b, c})
+
+
+class PrestamoAdminTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        genero = Genero.objects.create(descripcion='G')
+        cls.libro = Libro.objects.create(pk='9780000000001', titulo='Libro', genero=genero)
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+
+    def consultas_alta(self):
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.get(reverse('admin:app_prestamo_add')).status_code, 200)
+        return len(consultas.captured_queries)
+
+    def test_select_de_ejemplares_no_consulta_por_libro(self):
+        self.client.force_login(self.admin)
+        Ejemplar.bulk_add(self.libro, 2)
+        self.consultas_alta()
+        consultas = self.consultas_alta()
+        Ejemplar.bulk_add(self.libro, 10)
+        self.assertEqual(self.consultas_alta(), consultas)
+
+
+class BibliotecarioTest(TestCase):
+    def test_alta_de_bibliotecario_en_una_consulta(self):
+        usuario = User.objects.create(username='otro')
+        with self.assertNumQueries(1):
+            bibliotecario = Bibliotecario.objects.create(
+                dni='3', nombre='Eva', apellido='Diaz', email='eva@example.com', direccion='Calle 2',
+                fecha_nacimiento=date(1990, 1, 1), usuario=usuario)
+        self.assertIsNotNone(Socio.objects.get(pk=bibliotecario.pk).desde)
+
 
-# Create your tests here.
+class ConfiguracionTest(TestCase):
+    def test_cached_relee_la_base_al_vencer(self):
+        self.addCleanup(setattr, Configuracion, '_memo', (None, 0))
+        Configuracion.load().save()
+        self.assertEqual(Configuracion.cached().plazo_max_devolucion, 3)
+        # Otro proceso guardó: ni la señal ni la caché de Django de este proceso se enteran
+        Configuracion.objects.filter(pk=1).update(plazo_max_devolucion=7)
+        with self.assertNumQueries(0):
+            self.assertEqual(Configuracion.cached().plazo_max_devolucion, 3)
+        configuracion, _ = Configuracion._memo
+        Configuracion._memo = (configuracion, 0)
+        self.assertEqual(Configuracion.cached().plazo_max_devolucion, 7)
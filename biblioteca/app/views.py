@@ -94,7 +94,7 @@ def libros_prestados(request):
     from .forms import BuscadorForm
 
     args = {
-        'objetos': Prestamo.objects.filter(fecha_dev__isnull=True),
+        'objetos': Prestamo.objects.select_related('ejemplar__libro', 'socio').filter(fecha_dev__isnull=True),
         'form': BuscadorForm(request.GET)}
 
 
@@ -26,8 +26,9 @@ class SingletonModel(models.Model):
     @classmethod
     def load(cls):
         from django.core.cache import cache
-        if cache.get(cls.__name__) is None:
+        obj = cache.get(cls.__name__)
+        if obj is None:
             obj, created = cls.objects.get_or_create(pk=1)
             if not created:
                 obj.set_cache()
-        return cache.get(cls.__name__)
+        return obj